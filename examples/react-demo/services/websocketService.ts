@@ -45,6 +45,7 @@ class SuggesterWebSocket {
   private onStatusChange?: (status: ConnectionStatus) => void;
   private onSuggestions?: (suggestions: Tool[]) => void;
   private status: ConnectionStatus = 'disconnected';
+  private decoder = new TextDecoder();
 
   constructor(
     url: string = 'ws://localhost:8000/ws/suggest',
@@ -86,6 +87,8 @@ class SuggesterWebSocket {
 
       try {
         this.ws = new WebSocket(this.url);
+        // The gateway sends orjson-encoded binary frames.
+        this.ws.binaryType = 'arraybuffer';
 
         this.ws.onopen = () => {
           console.log('[WebSocket] Connected to Suggester Gateway');
@@ -96,7 +99,10 @@ class SuggesterWebSocket {
 
         this.ws.onmessage = (event) => {
           try {
-            const message = JSON.parse(event.data);
+            const raw = typeof event.data === 'string'
+              ? event.data
+              : this.decoder.decode(event.data);
+            const message = JSON.parse(raw);
             this.handleMessage(message);
           } catch (error) {
             console.error('[WebSocket] Failed to parse message:', error);
@@ -7,25 +7,51 @@ Provides real-time tool suggestions via WebSocket with REST fallback.
 
 from __future__ import annotations
 
-import json
+import asyncio
+import functools
+import hashlib
+import importlib.util
 import logging
+import mmap
+import os
+import pickle
 import sys
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    TypeVar,
+)
 
 try:
-    from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+    from fastapi import Depends, FastAPI, WebSocket, WebSocketDisconnect
     from fastapi.middleware.cors import CORSMiddleware
+    from fastapi.middleware.gzip import GZipMiddleware
+    from fastapi.responses import ORJSONResponse, StreamingResponse
+    import orjson
     import uvicorn
 except ImportError:
-    print("Error: FastAPI and uvicorn are required for react_gateway.")
-    print("Install with: pip install 'fastapi[standard]' uvicorn")
+    print("Error: FastAPI, uvicorn and orjson are required for react_gateway.")
+    print("Install with: pip install -e '.[gateway]'")
     sys.exit(1)
 
 # Add parent directory to path to import suggester
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
+import suggester
 from suggester.engine import SuggestionEngine
+from suggester.schemas import Suggestion
 
 
 # Configure logging
@@ -36,11 +62,32 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Load the catalog and build the engine off the event loop before serving."""
+    global tools_catalog
+
+    logger.info("Loading tools catalog...")
+    tools = await asyncio.to_thread(load_sample_tools)
+    tools_catalog = {tool["name"]: tool for tool in tools}
+
+    logger.info(f"Initializing SuggestionEngine with {len(tools)} tools...")
+    await _run_engine(_initialize_engine)
+
+    logger.info("✓ Suggester Gateway started successfully")
+    logger.info(f"  - Tools loaded: {len(tools)}")
+    logger.info(f"  - WebSocket endpoint: ws://localhost:8000/ws/suggest")
+    logger.info(f"  - REST endpoint: http://localhost:8000/api/suggest")
+    yield
+
+
 # Initialize FastAPI app
 app = FastAPI(
     title="Suggester React Gateway",
     description="WebSocket/REST gateway for React frontends",
-    version="0.1.0"
+    version="0.1.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
 )
 
 # Configure CORS for local development
@@ -52,12 +99,40 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress larger HTTP responses (e.g. /api/tools); small typing-driven replies
+# stay below the threshold and skip the compressor's fixed cost.
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+
 
-# Global engine instance (initialized on startup)
-engine: SuggestionEngine | None = None
+# Tools catalog (loaded on startup); the engine is built from it by _initialize_engine()
 tools_catalog: Dict[str, Any] = {}
 
-# Current engine configuration
+# Engine currently served by get_engine(); replaced wholesale, never built on the loop
+_engine: Optional[SuggestionEngine] = None
+
+# Engine calls run on one dedicated thread: the event loop keeps serving other
+# sockets while suggestions are computed, and calls stay serialized (in arrival
+# order) because the engine's sessions and caches are not thread-safe.
+_engine_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="suggester-engine")
+T = TypeVar("T")
+
+
+async def _run_engine(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run an engine call on the engine thread without blocking the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_engine_executor, functools.partial(func, *args, **kwargs))
+
+
+# Feed coalescing: deltas arriving within the debounce window are applied in one
+# engine.feed call so bursts of keystrokes produce a single suggestion cycle.
+# Pending state is keyed per connection, so sockets sharing a session id never
+# merge or cancel each other's deltas.
+FEED_DEBOUNCE_SECONDS = 0.015
+_FeedKey = Tuple[WebSocket, str]
+_pending_feeds: Dict[_FeedKey, asyncio.Task] = {}
+_pending_deltas: Dict[_FeedKey, str] = {}
+
+# Current engine configuration (changed only through _initialize_engine())
 current_config: Dict[str, Any] = {
     "top_k": 5,
     "max_intents": 3,
@@ -99,48 +174,121 @@ def load_sample_tools() -> List[Dict[str, Any]]:
         ]
 
 
-def _initialize_engine(config: Dict[str, Any] | None = None) -> None:
-    """Initialize or reinitialize the engine with given config."""
-    global engine, current_config
-
-    if config:
-        current_config.update(config)
-
-    tools = list(tools_catalog.values())
-
-    # Build kwargs from current_config
+def _engine_kwargs(config: Dict[str, Any]) -> Dict[str, Any]:
+    """Translate gateway config into SuggestionEngine keyword arguments."""
     kwargs = {
-        "top_k": current_config["top_k"],
-        "max_intents": current_config["max_intents"],
-        "locales": tuple(current_config["locales"]),
-        "min_score": current_config["min_score"],
-        "combine_strategy": current_config["combine_strategy"],
+        "top_k": config["top_k"],
+        "max_intents": config["max_intents"],
+        "locales": tuple(config["locales"]),
+        "min_score": config["min_score"],
+        "combine_strategy": config["combine_strategy"],
     }
 
     # Add intent_separator_tokens only if provided
-    if current_config["intent_separator_tokens"] is not None:
-        kwargs["intent_separator_tokens"] = current_config["intent_separator_tokens"]
+    if config["intent_separator_tokens"] is not None:
+        kwargs["intent_separator_tokens"] = config["intent_separator_tokens"]
+    return kwargs
+
+
+# Optional on-disk cache of the built engine (opt-in, e.g. for multi-worker deploys).
+# The file is unpickled on load, so it must live somewhere only this service can write.
+INDEX_CACHE_PATH = os.environ.get("SUGGESTER_INDEX_CACHE")
+# Bump when the cache file layout changes
+INDEX_CACHE_FORMAT = 1
+
+
+@lru_cache(maxsize=1)
+def _engine_source_digest() -> str:
+    """Digest of the core package sources, so builds from other code are never reused."""
+    digest = hashlib.sha256()
+    for path in sorted(Path(suggester.__file__).parent.glob("*.py")):
+        digest.update(path.name.encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def _index_fingerprint(tools: List[Dict[str, Any]], kwargs: Dict[str, Any]) -> str:
+    """Digest of everything the built engine depends on (code, catalog and engine kwargs)."""
+    payload = orjson.dumps(
+        [INDEX_CACHE_FORMAT, suggester.__version__, _engine_source_digest(), tools, kwargs],
+        option=orjson.OPT_SORT_KEYS,
+    )
+    return hashlib.sha256(payload).hexdigest()
+
+
+def _load_cached_engine(path: str, fingerprint: str) -> SuggestionEngine | None:
+    """Return the cached engine if `path` holds one built from the same fingerprint."""
+    try:
+        with open(path, "rb") as fh, mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            cached_fingerprint, engine = pickle.loads(buf)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable engine cache {path}: {e}")
+        return None
+    return engine if cached_fingerprint == fingerprint else None
+
 
+def _store_cached_engine(path: str, fingerprint: str, engine: SuggestionEngine) -> None:
+    """Write the engine cache atomically so concurrent workers never read a partial file."""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "wb") as fh:
+            pickle.dump((fingerprint, engine), fh, protocol=5)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.warning(f"Could not write engine cache {path}: {e}")
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+
+
+def _build_engine(config: Dict[str, Any]) -> SuggestionEngine:
+    """Build an engine for the current catalog and `config`.
+
+    With SUGGESTER_INDEX_CACHE set, a matching on-disk build is loaded instead.
+    """
+    kwargs = _engine_kwargs(config)
+    tools = list(tools_catalog.values())
+    fingerprint = ""
+    if INDEX_CACHE_PATH:
+        fingerprint = _index_fingerprint(tools, kwargs)
+        engine = _load_cached_engine(INDEX_CACHE_PATH, fingerprint)
+        if engine is not None:
+            logger.info(f"Loaded SuggestionEngine from cache {INDEX_CACHE_PATH}")
+            return engine
     logger.info(f"Initializing SuggestionEngine with config: {kwargs}")
     engine = SuggestionEngine(tools, **kwargs)
+    if INDEX_CACHE_PATH:
+        _store_cached_engine(INDEX_CACHE_PATH, fingerprint, engine)
+    return engine
 
 
-@app.on_event("startup")
-async def startup_event():
-    """Initialize engine on startup."""
-    global tools_catalog
+def get_engine() -> SuggestionEngine:
+    """Return the published engine; it is only ever built by _initialize_engine()."""
+    if _engine is None:
+        raise RuntimeError("SuggestionEngine is not initialized yet")
+    return _engine
 
-    logger.info("Loading tools catalog...")
-    tools = load_sample_tools()
-    tools_catalog = {tool["name"]: tool for tool in tools}
 
-    logger.info(f"Initializing SuggestionEngine with {len(tools)} tools...")
-    _initialize_engine()
+async def engine_dependency() -> SuggestionEngine:
+    """FastAPI dependency for the current engine (async: no threadpool hop)."""
+    return get_engine()
 
-    logger.info("✓ Suggester Gateway started successfully")
-    logger.info(f"  - Tools loaded: {len(tools)}")
-    logger.info(f"  - WebSocket endpoint: ws://localhost:8000/ws/suggest")
-    logger.info(f"  - REST endpoint: http://localhost:8000/api/suggest")
+
+def _initialize_engine(config: Dict[str, Any] | None = None) -> SuggestionEngine:
+    """Build an engine with the config changes applied, then publish it.
+
+    Runs on the engine thread. Requests keep using the previous engine until the
+    single reference swap at the end, and a failed build changes nothing.
+    """
+    global _engine
+    new_config = {**current_config, **(config or {})}
+    engine = _build_engine(new_config)
+    current_config.update(new_config)
+    _engine = engine
+    return engine
 
 
 @app.get("/")
@@ -165,18 +313,35 @@ async def health_check():
     """Health check endpoint."""
     return {
         "status": "healthy",
-        "engine_initialized": engine is not None,
+        "engine_initialized": _engine is not None,
         "tools_loaded": len(tools_catalog)
     }
 
 
+# Tools encoded per streamed chunk of /api/tools
+TOOLS_STREAM_CHUNK = 256
+
+
+async def _stream_tools(catalog: Dict[str, Any]) -> AsyncIterator[bytes]:
+    """Yield the tools payload as JSON chunks, encoding a bounded batch at a time."""
+    yield b'{"tools":['
+    batch: List[bytes] = []
+    first = True
+    for tool in catalog.values():
+        batch.append(orjson.dumps(tool))
+        if len(batch) >= TOOLS_STREAM_CHUNK:
+            yield (b"" if first else b",") + b",".join(batch)
+            first = False
+            batch = []
+    if batch:
+        yield (b"" if first else b",") + b",".join(batch)
+    yield b'],"count":' + str(len(catalog)).encode() + b"}"
+
+
 @app.get("/api/tools")
 async def get_tools():
-    """Get all available tools."""
-    return {
-        "tools": list(tools_catalog.values()),
-        "count": len(tools_catalog)
-    }
+    """Get all available tools (streamed, so large catalogs are never fully buffered)."""
+    return StreamingResponse(_stream_tools(tools_catalog), media_type="application/json")
 
 
 @app.get("/api/config")
@@ -188,6 +353,10 @@ async def get_config():
     }
 
 
+def _error_response(message: str, status_code: int = 400) -> ORJSONResponse:
+    return ORJSONResponse(content={"error": message}, status_code=status_code)
+
+
 @app.post("/api/config")
 async def update_config(payload: Dict[str, Any]):
     """Update engine configuration and reinitialize."""
@@ -198,25 +367,25 @@ async def update_config(payload: Dict[str, Any]):
         if "top_k" in payload:
             top_k = int(payload["top_k"])
             if top_k < 1 or top_k > 20:
-                return {"error": "top_k must be between 1 and 20"}, 400
+                return _error_response("top_k must be between 1 and 20")
             new_config["top_k"] = top_k
 
         if "max_intents" in payload:
             max_intents = int(payload["max_intents"])
             if max_intents < 1 or max_intents > 10:
-                return {"error": "max_intents must be between 1 and 10"}, 400
+                return _error_response("max_intents must be between 1 and 10")
             new_config["max_intents"] = max_intents
 
         if "min_score" in payload:
             min_score = float(payload["min_score"])
             if min_score < 0.0:
-                return {"error": "min_score must be >= 0.0"}, 400
+                return _error_response("min_score must be >= 0.0")
             new_config["min_score"] = min_score
 
         if "combine_strategy" in payload:
             strategy = str(payload["combine_strategy"]).lower()
             if strategy not in ["max", "sum"]:
-                return {"error": "combine_strategy must be 'max' or 'sum'"}, 400
+                return _error_response("combine_strategy must be 'max' or 'sum'")
             new_config["combine_strategy"] = strategy
 
         if "intent_separator_tokens" in payload:
@@ -229,7 +398,9 @@ async def update_config(payload: Dict[str, Any]):
                 # Parse comma-separated string
                 new_config["intent_separator_tokens"] = [t.strip() for t in tokens.split(",") if t.strip()]
             else:
-                return {"error": "intent_separator_tokens must be a list or comma-separated string"}, 400
+                return _error_response(
+                    "intent_separator_tokens must be a list or comma-separated string"
+                )
 
         if "locales" in payload:
             locales = payload["locales"]
@@ -238,8 +409,8 @@ async def update_config(payload: Dict[str, Any]):
             elif isinstance(locales, str):
                 new_config["locales"] = [loc.strip() for loc in locales.split(",") if loc.strip()]
 
-        # Reinitialize engine with new config
-        _initialize_engine(new_config)
+        # Reinitialize engine with new config (off the event loop, like every engine call)
+        await _run_engine(_initialize_engine, new_config)
 
         logger.info(f"Configuration updated: {new_config}")
 
@@ -251,43 +422,143 @@ async def update_config(payload: Dict[str, Any]):
 
     except ValueError as e:
         logger.error(f"Invalid config value: {e}")
-        return {"error": f"Invalid value: {str(e)}"}, 400
+        return _error_response(f"Invalid value: {str(e)}")
     except Exception as e:
         logger.error(f"Error updating config: {e}")
-        return {"error": str(e)}, 500
+        return _error_response(str(e), 500)
 
 
 @app.post("/api/suggest")
-async def suggest_rest(payload: Dict[str, Any]):
+async def suggest_rest(
+    payload: Dict[str, Any], engine: SuggestionEngine = Depends(engine_dependency)
+):
     """REST endpoint for suggestions (fallback)."""
-    if engine is None:
-        return {"error": "Engine not initialized"}, 500
-
     text = payload.get("text", "")
     session_id = payload.get("session_id", "default")
     action = payload.get("action", "submit")  # submit, feed, reset
 
     try:
         if action == "reset":
-            engine.reset(session_id)
-            return {"status": "reset", "session_id": session_id}
+            await _run_engine(engine.reset, session_id)
+            return ORJSONResponse(content={"status": "reset", "session_id": session_id})
 
         elif action == "feed":
             delta = payload.get("delta", "")
-            suggestions = engine.feed(delta, session_id=session_id)
+            suggestions = await _run_engine(engine.feed, delta, session_id=session_id)
 
         else:  # submit
-            suggestions = engine.submit(text, session_id=session_id)
-
-        return {
-            "suggestions": suggestions,
-            "session_id": session_id,
-            "text": text
-        }
+            suggestions = await _run_engine(engine.submit, text, session_id=session_id)
+
+        # Returning the response directly skips FastAPI's jsonable_encoder pass.
+        return ORJSONResponse(
+            content={
+                "suggestions": suggestions,
+                "session_id": session_id,
+                "text": text
+            }
+        )
 
     except Exception as e:
         logger.error(f"Error processing suggestion: {e}")
-        return {"error": str(e)}, 500
+        return ORJSONResponse(content={"error": str(e)}, status_code=500)
+
+
+# Fixed envelope of the "suggestions" frame, encoded once; only the suggestion
+# list and session id are serialized per message.
+_SUGGESTIONS_PREFIX = b'{"type":"suggestions","suggestions":'
+_SESSION_ID_KEY = b',"session_id":'
+
+
+def _encode_suggestions(suggestions: Sequence[Suggestion], session_id: str) -> bytes:
+    """Encode a suggestions frame using the precompiled envelope."""
+    return b"".join((
+        _SUGGESTIONS_PREFIX,
+        orjson.dumps(suggestions),
+        _SESSION_ID_KEY,
+        orjson.dumps(session_id),
+        b"}",
+    ))
+
+
+# Server-side fan-out registry for broadcast(). Only gateway code registers sockets
+# here: no client message subscribes, so frames never reach other users' connections.
+_subscribers: Dict[str, Set[WebSocket]] = {}
+
+
+async def _send(websocket: WebSocket, payload: bytes) -> None:
+    """Send one pre-encoded frame to a single client."""
+    await websocket.send_bytes(payload)
+
+
+async def broadcast(session_ids: Iterable[str], payload: bytes) -> None:
+    """Send the same encoded frame to every subscriber of `session_ids` concurrently.
+
+    The payload is serialized once by the caller; a slow or closed socket does not
+    hold up the others (failures are logged and otherwise ignored).
+    """
+    targets = {ws for session_id in session_ids for ws in _subscribers.get(session_id, ())}
+    results = await asyncio.gather(*(_send(ws, payload) for ws in targets), return_exceptions=True)
+    for result in results:
+        if isinstance(result, Exception):
+            logger.warning(f"Dropped broadcast frame: {result}")
+
+
+def _subscribe(session_id: str, websocket: WebSocket) -> None:
+    _subscribers.setdefault(session_id, set()).add(websocket)
+
+
+def _unsubscribe(session_id: str, websocket: WebSocket) -> None:
+    subs = _subscribers.get(session_id)
+    if subs is None:
+        return
+    subs.discard(websocket)
+    if not subs:
+        del _subscribers[session_id]
+
+
+def _unsubscribe_all(websocket: WebSocket) -> None:
+    for session_id in [sid for sid, subs in _subscribers.items() if websocket in subs]:
+        _unsubscribe(session_id, websocket)
+
+
+def _cancel_pending_feed(websocket: WebSocket, session_id: str) -> None:
+    """Drop a connection's coalesced deltas for a session (used by submit/reset)."""
+    key = (websocket, session_id)
+    task = _pending_feeds.pop(key, None)
+    if task is not None:
+        task.cancel()
+    _pending_deltas.pop(key, None)
+
+
+def _cancel_pending_feeds(websocket: WebSocket) -> None:
+    """Drop every coalesced delta of a closing connection."""
+    for key in [key for key in _pending_feeds if key[0] is websocket]:
+        _cancel_pending_feed(*key)
+
+
+async def _drain_feed(websocket: WebSocket, session_id: str) -> None:
+    """Wait for the debounce window, then apply all pending deltas at once."""
+    await asyncio.sleep(FEED_DEBOUNCE_SECONDS)
+    key = (websocket, session_id)
+    _pending_feeds.pop(key, None)
+    delta = _pending_deltas.pop(key, "")
+    try:
+        engine = get_engine()
+        suggestions = await _run_engine(engine.feed, delta, session_id=session_id)
+        await _send(websocket, _encode_suggestions(suggestions, session_id))
+    except Exception as e:
+        logger.error(f"Error processing feed for session {session_id}: {e}")
+
+
+async def _receive_message(websocket: WebSocket) -> Dict[str, Any]:
+    """Receive one client frame (text or binary) and decode it with orjson."""
+    message = await websocket.receive()
+    if message["type"] == "websocket.disconnect":
+        raise WebSocketDisconnect(message.get("code", 1000))
+    data = message.get("bytes")
+    if data is None:
+        data = message.get("text") or "{}"
+    return orjson.loads(data)
 
 
 @app.websocket("/ws/suggest")
@@ -301,71 +572,99 @@ async def websocket_suggest(websocket: WebSocket):
     try:
         while True:
             # Receive message from client
-            data = await websocket.receive_text()
-            message = json.loads(data)
+            message = await _receive_message(websocket)
 
             msg_type = message.get("type")
             session_id = message.get("session_id", "default")
+            # Resolved per message so config updates apply to open connections
+            engine = get_engine()
 
             if msg_type == "feed":
-                # Incremental text delta
+                # Incremental text delta (coalesced per connection and session)
                 delta = message.get("delta", "")
-                suggestions = engine.feed(delta, session_id=session_id)
-
-                await websocket.send_json({
-                    "type": "suggestions",
-                    "suggestions": suggestions,
-                    "session_id": session_id
-                })
+                key = (websocket, session_id)
+                _pending_deltas[key] = _pending_deltas.get(key, "") + delta
+                if key not in _pending_feeds:
+                    _pending_feeds[key] = asyncio.create_task(_drain_feed(websocket, session_id))
 
             elif msg_type == "submit":
-                # Full text submission
+                # Full text submission replaces any pending deltas
+                _cancel_pending_feed(websocket, session_id)
                 text = message.get("text", "")
-                suggestions = engine.submit(text, session_id=session_id)
+                suggestions = await _run_engine(engine.submit, text, session_id=session_id)
 
-                await websocket.send_json({
-                    "type": "suggestions",
-                    "suggestions": suggestions,
-                    "session_id": session_id
-                })
+                await _send(websocket, _encode_suggestions(suggestions, session_id))
 
             elif msg_type == "reset":
                 # Reset session
-                engine.reset(session_id)
+                _cancel_pending_feed(websocket, session_id)
+                await _run_engine(engine.reset, session_id)
 
-                await websocket.send_json({
+                await _send(websocket, orjson.dumps({
                     "type": "reset",
                     "session_id": session_id,
                     "status": "ok"
-                })
+                }))
 
             elif msg_type == "ping":
                 # Health check
-                await websocket.send_json({
+                await _send(websocket, orjson.dumps({
                     "type": "pong",
                     "timestamp": message.get("timestamp")
-                })
+                }))
 
     except WebSocketDisconnect:
         logger.info(f"WebSocket client disconnected (session: {session_id})")
-        if session_id and engine:
-            engine.reset(session_id)
+        _unsubscribe_all(websocket)
+        _cancel_pending_feeds(websocket)
+        # Clean up session
+        if session_id:
+            await _run_engine(get_engine().reset, session_id)
 
     except Exception as e:
         logger.error(f"WebSocket error: {e}")
+        _unsubscribe_all(websocket)
+        _cancel_pending_feeds(websocket)
         try:
-            await websocket.send_json({
+            await _send(websocket, orjson.dumps({
                 "type": "error",
                 "error": str(e)
-            })
+            }))
         except:
             pass
 
 
-def run_server(host: str = "127.0.0.1", port: int = 8000):
-    """Run the gateway server."""
-    logger.info(f"Starting Suggester Gateway on {host}:{port}")
-    uvicorn.run(app, host=host, port=port, log_level="info")
+def _has_module(name: str) -> bool:
+    return importlib.util.find_spec(name) is not None
+
+
+def run_server(host: str = "127.0.0.1", port: int = 8000, workers: int | None = None):
+    """Run the gateway server.
+
+    `workers` defaults to $WEB_CONCURRENCY (or 1). Each worker process builds its
+    own engine and keeps its own sessions, so multi-worker deployments need sticky
+    routing by session_id (WebSocket connections are naturally pinned to a worker).
+    """
+    workers = workers or int(os.getenv("WEB_CONCURRENCY", "0")) or 1
+    # Prefer the libuv event loop and C HTTP parser (uvicorn[standard]) when installed.
+    loop = "uvloop" if _has_module("uvloop") else "asyncio"
+    http = "httptools" if _has_module("httptools") else "h11"
+    logger.info(
+        f"Starting Suggester Gateway on {host}:{port} "
+        f"(workers={workers}, loop={loop}, http={http})"
+    )
+    # Multiple workers require an import string so each process can load the app.
+    target = "suggester.adapters.react_gateway:app" if workers > 1 else app
+    uvicorn.run(
+        target,
+        host=host,
+        port=port,
+        workers=workers,
+        loop=loop,
+        http=http,
+        ws_per_message_deflate=True,  # large suggestion frames compress on the wire
+        log_level="info",
+    )
 
 
 if __name__ == "__main__":
@@ -1,14 +1,19 @@
 from __future__ import annotations
 
+import heapq
 import math
-from collections import defaultdict
+import re
+from bisect import bisect_left
+from collections import Counter, OrderedDict, defaultdict
 from dataclasses import dataclass
-from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+from functools import lru_cache
+from itertools import compress
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Sequence, Set, Tuple
 
 from .schemas import Field, Suggestion, ToolSpec
 from .tokenizer import normalize, stopwords, tokens, tokens_with_spans
 from .trie import Trie
-from .inverted_index import InvertedIndex
+from .inverted_index import FIELD_MASK_LABELS, InvertedIndex, Partial, merge_partials
 
 _DEFAULT_INTENT_SEPARATORS: Tuple[str, ...] = (
     "e",
@@ -21,10 +26,41 @@ _DEFAULT_INTENT_SEPARATORS: Tuple[str, ...] = (
     "also",
 )
 
+# Token role bits for _intent_windows: one dict probe per token instead of
+# separate stopword/anchor/separator set lookups.
+_TOKEN_STOP = 1
+_TOKEN_ANCHOR = 2
+_TOKEN_SEPARATOR = 4
+
+_PARTIAL_CACHE_SIZE = 256
+
+# Punctuation that separates intents ("exportar csv, enviar email")
+_PUNCT_RE = re.compile(r"[,;]")
+
+# (token, (start, end)) pairs over the normalized text
+_TokenStream = Tuple[Tuple[str, Tuple[int, int]], ...]
+
+# Last whitespace of a buffer: text before it is settled while the user types
+_LAST_SPACE_RE = re.compile(r"\s(?=\S*\Z)")
+
+
+def _copy_suggestion(item: Suggestion) -> Suggestion:
+    """Copy a suggestion along with its nested containers (cheaper than deepcopy)."""
+    copy = item.copy()
+    copy["arguments_template"] = dict(item["arguments_template"])
+    tags = item["metadata"]["tags"]
+    copy["metadata"] = {"tags": list(tags) if tags is not None else None}
+    return copy
+
 
 @dataclass
 class _Session:
     buffer: str = ""
+    # parse of buffer[:stable_len] (which ends at whitespace); only the text after
+    # it is re-parsed on feed
+    stable_len: int = 0
+    stable_text: str = ""
+    stable_stream: _TokenStream = ()
 
 
 @dataclass
@@ -57,6 +93,7 @@ class SuggestionEngine:
         intent_separator_tokens: Sequence[str] | None = None,
         combine_strategy: str = "max",
         multi_intent_bonus: float = 0.0,
+        suggest_cache_size: int = 1024,
     ) -> None:
         self._logger = logger
         self._locales = tuple(locales)
@@ -84,6 +121,14 @@ class SuggestionEngine:
             raise ValueError(f"combine_strategy must be 'max' or 'sum', got {combine_strategy}")
         self._combine_strategy = strategy
         self._multi_intent_bonus = float(multi_intent_bonus)
+        self._suggest_cache_size = max(0, int(suggest_cache_size))
+        # normalized text -> suggestions; cleared whenever the catalog changes
+        self._suggest_cache: OrderedDict[str, List[Suggestion]] = OrderedDict()
+        # complete terms of a window -> their index partial; while the user types the
+        # last token only the prefix expansion changes, so this part is reused
+        self._partial_cache: OrderedDict[FrozenSet[str], Partial] = OrderedDict()
+        # raw text -> (normalized text, token stream); parsing is pure, never invalidated
+        self._parse = lru_cache(maxsize=512)(self._parse_impl)
 
         self._sessions: Dict[str, _Session] = {}
         self._catalog: Dict[str, ToolSpec] = {}
@@ -91,16 +136,40 @@ class SuggestionEngine:
         self._term_to_tools: Dict[str, set[str]] = defaultdict(set)
         self._term_lengths: Dict[str, int] = {}
         self._inv_index = InvertedIndex()
-        self._anchor_vocab: Set[str] = set()
-        self._stopwords = stopwords(self._locales) if self._drop_stopwords else set()
+        # anchor term -> number of tools using it in an anchor field
+        self._anchor_vocab: Counter[str] = Counter()
+        self._tool_anchors: Dict[str, FrozenSet[str]] = {}
+        # tool name -> sorted unique terms it put in the trie (remove_tool deletes exactly these)
+        self._terms_cache: Dict[str, List[str]] = {}
+        self._stopwords = stopwords(self._locales) if self._drop_stopwords else frozenset()
+        self._base_token_flags: Dict[str, int] = {}
+        for tok in self._stopwords:
+            self._base_token_flags[tok] = self._base_token_flags.get(tok, 0) | _TOKEN_STOP
+        for tok in self._intent_separator_set:
+            self._base_token_flags[tok] = self._base_token_flags.get(tok, 0) | _TOKEN_SEPARATOR
+        self._token_flags: Dict[str, int] = dict(self._base_token_flags)
 
         self.add_tools(tools)
 
+    # --- Pickling ---
+    def __getstate__(self) -> Dict[str, Any]:
+        """Pickle the built index only; sessions and caches are runtime state."""
+        state = self.__dict__.copy()
+        del state["_parse"]  # lru_cache wrapper around a bound method
+        state["_sessions"] = {}
+        state["_suggest_cache"] = OrderedDict()
+        state["_partial_cache"] = OrderedDict()
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._parse = lru_cache(maxsize=512)(self._parse_impl)
+
     # --- Session API ---
     def feed(self, text_delta: str, *, session_id: str) -> List[Suggestion]:
         session = self._sessions.setdefault(session_id, _Session())
         session.buffer += text_delta
-        return self._suggest(session.buffer)
+        return self._suggest_parsed(*self._parse_session(session))
 
     def submit(self, text: str, *, session_id: str) -> List[Suggestion]:
         self._sessions[session_id] = _Session(buffer=text)
@@ -111,43 +180,67 @@ class SuggestionEngine:
 
     # --- Catalog ---
     def add_tools(self, tools: Iterable[ToolSpec]) -> None:
+        self._invalidate_caches()
         for tool in tools:
             name = tool.get("name")
             if not name:
                 continue
+            if name in self._catalog:
+                # replace, not double-index: drop the old postings, refcounts and anchors
+                self.remove_tool(name)
             self._catalog[name] = tool
-            terms = self._extract_terms(tool)
-            for term in terms:
-                self._trie.insert(term)
-                self._term_to_tools[term].add(name)
-                self._term_lengths[term] = len(term)
-            by_field = self._extract_terms_by_field(tool)
-            self._inv_index.add_tool(name, by_field)
-            self._anchor_vocab.update(self._anchor_terms_from_fields(by_field))
+            terms = self._terms_cache[name] = self._extract_terms(tool)
+            self._index_tool(name, terms, self._extract_terms_by_field(tool))
+        self._inv_index.finalize()
 
     def remove_tool(self, name: str) -> None:
-        if name not in self._catalog:
+        """Remove a tool, deleting only its own postings from the trie and indexes."""
+        if self._catalog.pop(name, None) is None:
             return
-        del self._catalog[name]
-        # Rebuild lightweight maps (simpler than incremental delete on trie)
-        self._rebuild_index()
+        self._invalidate_caches()
+        for term in self._terms_cache.pop(name):
+            self._trie.delete(term)
+            owners = self._term_to_tools.get(term)
+            if owners is None:
+                continue
+            owners.discard(name)
+            if not owners:
+                del self._term_to_tools[term]
+                self._term_lengths.pop(term, None)
+        self._inv_index.remove_tool(name)
+        anchors = self._tool_anchors.pop(name, frozenset())
+        self._anchor_vocab.subtract(anchors)
+        self._unmark_anchor_terms([t for t in anchors if self._anchor_vocab[t] <= 0])
 
     # --- Internals ---
-    def _rebuild_index(self) -> None:
-        self._trie = Trie()
-        self._term_to_tools = defaultdict(set)
-        self._term_lengths = {}
-        self._inv_index = InvertedIndex()
-        self._anchor_vocab = set()
-        for tool in self._catalog.values():
-            terms = self._extract_terms(tool)
-            for term in terms:
-                self._trie.insert(term)
-                self._term_to_tools[term].add(tool["name"])
-                self._term_lengths[term] = len(term)
-            by_field = self._extract_terms_by_field(tool)
-            self._inv_index.add_tool(tool["name"], by_field)
-            self._anchor_vocab.update(self._anchor_terms_from_fields(by_field))
+    def _invalidate_caches(self) -> None:
+        """Drop results that depend on the catalog (scores, idf, anchors)."""
+        self._suggest_cache.clear()
+        self._partial_cache.clear()
+
+    def _complete_partial(self, complete_terms: FrozenSet[str]) -> Partial:
+        """Return the (cached) index partial for a window's complete terms."""
+        partial = self._partial_cache.get(complete_terms)
+        if partial is None:
+            partial = self._inv_index.accumulate(complete_terms, complete_terms=complete_terms)
+            self._partial_cache[complete_terms] = partial
+            if len(self._partial_cache) > _PARTIAL_CACHE_SIZE:
+                self._partial_cache.popitem(last=False)
+        else:
+            self._partial_cache.move_to_end(complete_terms)
+        return partial
+
+    def _index_tool(self, name: str, terms: List[str], by_field: Dict[Field, List[str]]) -> None:
+        """Insert a tool's pre-extracted terms into the trie, term maps and inverted index."""
+        for term in terms:
+            self._trie.insert(term)
+            self._term_to_tools[term].add(name)
+            self._term_lengths[term] = len(term)
+        self._inv_index.add_tool(name, by_field)
+        anchors = frozenset(self._anchor_terms_from_fields(by_field))
+        self._tool_anchors[name] = anchors
+        self._mark_anchor_terms([t for t in anchors if t not in self._anchor_vocab])
+        self._anchor_vocab.update(anchors)
 
     def _extract_terms(self, tool: ToolSpec) -> List[str]:
         terms: List[str] = []
@@ -194,54 +287,98 @@ class SuggestionEngine:
             terms.update(by_field.get(field, []))
         return terms
 
-    def _intent_windows(self, text: str) -> List[_IntentWindow]:
-        """Return intent windows extracted from text, respecting separators and anchors."""
+    def _mark_anchor_terms(self, terms: Iterable[str]) -> None:
+        flags = self._token_flags
+        for term in terms:
+            flags[term] = flags.get(term, 0) | _TOKEN_ANCHOR
+
+    def _unmark_anchor_terms(self, terms: Iterable[str]) -> None:
+        """Drop terms no remaining tool uses in an anchor field."""
+        for term in terms:
+            del self._anchor_vocab[term]
+            flags = self._token_flags.get(term, 0) & ~_TOKEN_ANCHOR
+            if flags:
+                self._token_flags[term] = flags
+            else:
+                self._token_flags.pop(term, None)
+
+    def _parse_impl(self, text: str) -> Tuple[str, _TokenStream]:
+        """Normalize text once and tokenize it with spans relative to the normalized form."""
+        normalized_text = normalize(text)
         stream = tokens_with_spans(
-            text,
+            normalized_text,
             drop_stopwords=False,
             locales=self._locales,
             remove_noise=True,
         )
-        if not stream:
-            return []
-
-        normalized_text = normalize(text)
+        return normalized_text, tuple(stream)
+
+    def _parse_session(self, session: _Session) -> Tuple[str, _TokenStream]:
+        """Parse a session buffer, reusing the parse of everything before its last whitespace.
+
+        normalize() and tokenization never look across whitespace, so a prefix ending
+        at whitespace parses the same alone as inside the longer buffer.
+        """
+        buffer = session.buffer
+        match = _LAST_SPACE_RE.search(buffer, session.stable_len)
+        if match is not None:
+            session.stable_text, session.stable_stream = self._extend_parse(
+                session.stable_text, session.stable_stream, buffer[session.stable_len : match.end()]
+            )
+            session.stable_len = match.end()
+        return self._extend_parse(
+            session.stable_text, session.stable_stream, buffer[session.stable_len :]
+        )
 
-        tokens_only: List[str] = []
-        is_stop_flags: List[bool] = []
-        is_anchor_flags: List[bool] = []
-        spans: List[Tuple[int, int]] = []
-        is_separator_flags: List[bool] = []
-
-        for tok, span in stream:
-            tokens_only.append(tok)
-            is_stop = self._drop_stopwords and tok in self._stopwords
-            is_stop_flags.append(is_stop)
-            is_anchor = tok in self._anchor_vocab
-            is_anchor_flags.append(is_anchor)
-            spans.append(span)
-            is_separator_flags.append(tok in self._intent_separator_set)
-
-        if not tokens_only:
+    def _extend_parse(
+        self, normalized_text: str, stream: _TokenStream, tail: str
+    ) -> Tuple[str, _TokenStream]:
+        """Append the parse of raw `tail` to a parsed prefix that ended at whitespace."""
+        tail_text, tail_stream = self._parse(tail)
+        if not tail_text:
+            return normalized_text, stream
+        if not normalized_text:
+            return tail_text, tail_stream
+        offset = len(normalized_text) + 1
+        shifted = tuple((tok, (start + offset, end + offset)) for tok, (start, end) in tail_stream)
+        return f"{normalized_text} {tail_text}", stream + shifted
+
+    def _intent_windows(self, normalized_text: str, stream: _TokenStream) -> List[_IntentWindow]:
+        """Return intent windows from a parsed stream, respecting separators and anchors."""
+        if not stream:
             return []
 
-        punctuation_boundaries: Set[int] = set()
-        prev_end = 0
-        for idx, span in enumerate(spans):
-            gap = normalized_text[prev_end : span[0]]
-            if any(ch in gap for ch in (",", ";")):
-                punctuation_boundaries.add(idx)
-            prev_end = span[1]
+        # Column-wise (SoA) token bookkeeping: one flat list per attribute, each
+        # built by a single comprehension instead of appending per token.
+        tokens_only: List[str] = [tok for tok, _ in stream]
+        spans: List[Tuple[int, int]] = [span for _, span in stream]
+        token_flags = self._token_flags
+        flags = [token_flags.get(tok, 0) for tok in tokens_only]
+        is_anchor_flags: List[bool] = [bool(f & _TOKEN_ANCHOR) for f in flags]
+        is_separator_flags: List[bool] = [bool(f & _TOKEN_SEPARATOR) for f in flags]
+        # the stop bit is only set when drop_stopwords is enabled
+        keep_flags: List[bool] = [not f & _TOKEN_STOP for f in flags]
+        anchor_positions = list(compress(range(len(tokens_only)), is_anchor_flags))
+
+        # A "," or ";" before a token starts a new segment at that token. One regex
+        # pass finds the marks; bisect maps each to the next token (marks never fall
+        # inside a token, so no slicing of the gaps between tokens is needed).
+        punctuation_boundaries: List[bool] = [False] * len(tokens_only)
+        starts = [span[0] for span in spans]
+        for match in _PUNCT_RE.finditer(normalized_text):
+            idx = bisect_left(starts, match.start())
+            if idx < len(starts):
+                punctuation_boundaries[idx] = True
 
         segments: List[Tuple[int, int]] = []
         start = 0
-        for idx, token in enumerate(tokens_only):
-            if is_separator_flags[idx]:
+        for idx, is_separator in enumerate(is_separator_flags):
+            if is_separator:
                 if start < idx:
                     segments.append((start, idx))
                 start = idx + 1
                 continue
-            if idx in punctuation_boundaries and start < idx:
+            if punctuation_boundaries[idx] and start < idx:
                 segments.append((start, idx))
                 start = idx
         if start < len(tokens_only):
@@ -251,16 +388,16 @@ class SuggestionEngine:
             segments = [(0, len(tokens_only))]
 
         windows: List[_IntentWindow] = []
+        radius = self._window_radius
 
         for seg_start, seg_end in segments:
-            anchor_indices: List[int] = [
-                idx for idx in range(seg_start, seg_end) if is_anchor_flags[idx]
-            ]
+            lo = bisect_left(anchor_positions, seg_start)
+            hi = bisect_left(anchor_positions, seg_end, lo)
             window_ranges: List[Tuple[int, int]] = []
-            if anchor_indices:
-                for anchor_idx in anchor_indices:
-                    start_idx = max(seg_start, anchor_idx - self._window_radius)
-                    end_idx = min(seg_end, anchor_idx + self._window_radius + 1)
+            if lo < hi:
+                for anchor_idx in anchor_positions[lo:hi]:
+                    start_idx = max(seg_start, anchor_idx - radius)
+                    end_idx = min(seg_end, anchor_idx + radius + 1)
                     if window_ranges and start_idx <= window_ranges[-1][1]:
                         prev_start, prev_end = window_ranges[-1]
                         window_ranges[-1] = (prev_start, max(prev_end, end_idx))
@@ -270,23 +407,16 @@ class SuggestionEngine:
                 window_ranges.append((seg_start, seg_end))
 
             for win_start, win_end in window_ranges:
-                scoped_tokens: List[str] = []
-                anchor_hits = 0
-                for idx in range(win_start, win_end):
-                    if is_anchor_flags[idx]:
-                        anchor_hits += 1
-                    if self._drop_stopwords and is_stop_flags[idx]:
-                        continue
-                    scoped_tokens.append(tokens_only[idx])
+                scoped_tokens = list(
+                    compress(tokens_only[win_start:win_end], keep_flags[win_start:win_end])
+                )
                 if not scoped_tokens:
                     continue
-                last_prefix = scoped_tokens[-1]
-                complete_terms = scoped_tokens[:-1]
                 windows.append(
                     _IntentWindow(
-                        complete_terms=complete_terms,
-                        last_prefix=last_prefix,
-                        anchor_hits=anchor_hits,
+                        complete_terms=scoped_tokens[:-1],
+                        last_prefix=scoped_tokens[-1],
+                        anchor_hits=sum(is_anchor_flags[win_start:win_end]),
                     )
                 )
 
@@ -306,11 +436,60 @@ class SuggestionEngine:
         return None
 
     def _suggest(self, text: str) -> List[Suggestion]:
-        windows = self._intent_windows(text)
+        """Return suggestions for text, memoized by its normalized form."""
+        return self._suggest_parsed(*self._parse(text))
+
+    def _suggest_parsed(self, key: str, stream: _TokenStream) -> List[Suggestion]:
+        cached = self._suggest_cache.get(key)
+        if cached is None:
+            cached = self._compute_suggestions(key, stream)
+            if self._suggest_cache_size:
+                self._suggest_cache[key] = cached
+                if len(self._suggest_cache) > self._suggest_cache_size:
+                    self._suggest_cache.popitem(last=False)
+        else:
+            self._suggest_cache.move_to_end(key)
+        # copies keep callers from mutating cached entries (or the catalog's tag lists)
+        return [_copy_suggestion(item) for item in cached]
+
+    def _combine(
+        self, window_results: Sequence[Tuple[int, List[Tuple[str, float, Dict[str, int]]]]]
+    ) -> Dict[str, Dict[str, Any]]:
+        """Merge per-window rankings into {tool: {score, reasons, hits}}.
+
+        Pure function of its input (no engine state is mutated), kept separate so it
+        can be run or swapped independently of window extraction and index lookups.
+        """
+        combined: Dict[str, Dict[str, Any]] = {}
+        use_max = self._combine_strategy == "max"
+        for idx, ranked in window_results:
+            decay = 1.0 / (idx + 1)
+            for tool_name, score, contrib in ranked:
+                entry = combined.get(tool_name)
+                if entry is None:
+                    entry = combined[tool_name] = {"score": 0.0, "reasons": {}, "hits": 0}
+                if use_max:
+                    entry["score"] = max(entry["score"], float(score))
+                else:
+                    entry["score"] += float(score) * decay
+                entry["hits"] += 1
+                reason_map = entry["reasons"]
+                for term, bits in contrib.items():
+                    reason_map[term] = reason_map.get(term, 0) | bits
+
+        if self._multi_intent_bonus:
+            for entry in combined.values():
+                hits = entry["hits"]
+                if hits > 1:
+                    entry["score"] += self._multi_intent_bonus * (hits - 1)
+        return combined
+
+    def _compute_suggestions(self, normalized_text: str, stream: _TokenStream) -> List[Suggestion]:
+        windows = self._intent_windows(normalized_text, stream)
         if not windows:
             return []
 
-        combined: Dict[str, Dict[str, Any]] = {}
+        window_results: List[Tuple[int, List[Tuple[str, float, Dict[str, int]]]]] = []
         window_top_k = self._top_k if self._max_intents <= 1 else max(
             self._top_k, self._top_k * self._max_intents
         )
@@ -320,64 +499,56 @@ class SuggestionEngine:
             if window.last_prefix:
                 expanded_terms.update(self._trie.prefix_terms(window.last_prefix, limit=64))
 
-            complete_terms_set = set(window.complete_terms)
-            query_terms = complete_terms_set | expanded_terms
-            if not query_terms:
+            complete_terms_set = frozenset(window.complete_terms)
+            if not complete_terms_set and not expanded_terms:
                 continue
 
-            min_hits = self._min_complete_hits(window.anchor_hits, window.complete_terms)
-            ranked = self._inv_index.query(
-                complete_terms=complete_terms_set,
-                expanded_terms=expanded_terms,
+            # None only when there are no complete terms, i.e. nothing to require
+            min_hits = self._min_complete_hits(window.anchor_hits, window.complete_terms) or 0
+            # tools without an anchor hit in the window are dropped by rank(), so the
+            # expansion terms (the uncached part) only score anchored tools
+            candidates = (
+                self._inv_index.anchor_candidates(
+                    complete_terms_set | expanded_terms, self._anchor_fields
+                )
+                if self._require_anchor
+                else None
+            )
+            partial = merge_partials(
+                self._complete_partial(complete_terms_set),
+                self._inv_index.accumulate(
+                    expanded_terms - complete_terms_set,
+                    complete_terms=complete_terms_set,
+                    candidates=candidates,
+                ),
+            )
+            ranked = self._inv_index.rank(
+                partial,
+                required=min_hits,
                 require_anchor=self._require_anchor,
                 anchor_fields=self._anchor_fields,
-                alpha=self._alpha,
                 min_score=self._min_score,
                 top_k=window_top_k,
-                min_complete_hits=min_hits,
-                query_terms=query_terms,
             )
-            if not ranked:
-                continue
-
-            decay = 1.0 / (idx + 1)
-            for tool_name, score, contrib in ranked:
-                entry = combined.setdefault(
-                    tool_name,
-                    {"score": 0.0, "reasons": defaultdict(set), "hits": 0},
-                )
-                if self._combine_strategy == "max":
-                    entry["score"] = max(entry["score"], float(score))
-                else:
-                    entry["score"] += float(score) * decay
-                entry["hits"] += 1
-                reason_map = entry["reasons"]
-                for term, fields in contrib.items():
-                    field_set = reason_map.setdefault(term, set())
-                    field_set.update(fields)
+            if ranked:
+                window_results.append((idx, ranked))
 
+        combined = self._combine(window_results)
         if not combined:
             return []
 
-        for entry in combined.values():
-            hits = entry["hits"]
-            if hits > 1 and self._multi_intent_bonus:
-                entry["score"] += self._multi_intent_bonus * (hits - 1)
-
-        ranked_tools = sorted(
-            combined.items(),
-            key=lambda item: item[1]["score"],
-            reverse=True,
+        # Only top_k survive: a bounded heap beats sorting every candidate
+        ranked_tools = heapq.nlargest(
+            self._top_k, combined.items(), key=lambda item: item[1]["score"]
         )
 
         suggestions: List[Suggestion] = []
-        for tool_name, data in ranked_tools[: self._top_k]:
+        for tool_name, data in ranked_tools:
             tool = self._catalog.get(tool_name, {"name": tool_name, "description": tool_name})
-            parts = []
-            for term in sorted(data["reasons"].keys()):
-                fields = ",".join(sorted(data["reasons"][term]))
-                parts.append(f"{term}: {fields}")
-            reason = "; ".join(parts)
+            reasons = data["reasons"]
+            reason = "; ".join(
+                f"{term}: {FIELD_MASK_LABELS[reasons[term]]}" for term in sorted(reasons)
+            )
             suggestions.append(
                 {
                     "id": tool_name,
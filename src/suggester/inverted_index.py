@@ -1,28 +1,97 @@
 from __future__ import annotations
 
+import heapq
 import math
-from collections import defaultdict
-from typing import DefaultDict, Dict, Iterable, List, MutableMapping, Optional, Sequence, Set, Tuple
+from array import array
+from collections import Counter
+from functools import lru_cache
+from itertools import compress
+from operator import itemgetter
+from typing import (
+    AbstractSet,
+    Dict,
+    FrozenSet,
+    Iterable,
+    List,
+    MutableMapping,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
 
 
 Field = str  # expected values: "name", "keywords", "aliases", "description"
 
+# Bit per field for compact contribution masks (order follows schemas.Field).
+FIELD_BITS: Dict[Field, int] = {"name": 1, "keywords": 2, "aliases": 4, "description": 8}
+# interned tool number -> (score, matched complete terms, contributions {term: FIELD_BITS
+# mask}, OR of all contribution masks)
+Partial = Dict[int, Tuple[float, int, Dict[str, int], int]]
+
+# mask -> "field1,field2" (sorted names), precomputed for all 16 combinations
+FIELD_MASK_LABELS: Tuple[str, ...] = tuple(
+    ",".join(sorted(f for f, bit in FIELD_BITS.items() if mask & bit)) for mask in range(16)
+)
+
+# sort key for (tool, score, contributions) rows; C-level, unlike a lambda
+_score_key = itemgetter(1)
+
+# Field -> lane index (the position of its FIELD_BITS bit)
+FIELD_INDEX: Dict[Field, int] = {field: bit.bit_length() - 1 for field, bit in FIELD_BITS.items()}
+# Postings pack a tool's per-field tf for a term into one int: an 8-bit lane per
+# field (lane i holds the field with FIELD_INDEX i), tf capped at 255.
+FIELD_SHIFTS: Dict[Field, int] = {field: 8 * index for field, index in FIELD_INDEX.items()}
+_LANE_MAX = 0xFF
+# fields in lane order
+_LANE_FIELDS: Tuple[Field, ...] = tuple(sorted(FIELD_INDEX, key=FIELD_INDEX.__getitem__))
+
+
+@lru_cache(maxsize=16)
+def _fields_mask(fields: Tuple[Field, ...]) -> int:
+    """OR of FIELD_BITS for `fields` (anchor fields rarely change between calls)."""
+    mask = 0
+    for field in fields:
+        mask |= FIELD_BITS.get(field, 0)
+    return mask
+
+
+# A term's postings column-wise, ordered by tool number:
+# (tool numbers 'i', tf × field weight 'd', FIELD_BITS mask 'B')
+_Column = Tuple["array[int]", "array[float]", "array[int]"]
+
 
 class InvertedIndex:
     """Inverted index over tool terms with field-aware postings and simple TF‑IDF.
 
     Data model:
-    - term_to_tools[term][tool_id][field] = tf (int)
+    - term_to_tools[term][tool_id] = packed tf (one FIELD_SHIFTS lane per field)
     - df[term] = number of unique tools containing the term
     - tools: set of tool_ids registered (for N in idf)
+    - tool_terms[tool_id] = terms posted for the tool (for incremental removal)
+    - _columns[term] = (tool numbers, weighted tf, field masks): typed arrays holding
+      a term's postings in tool-number order with tf × field weight prebaked, built
+      on first query use (or by finalize())
+    - _tool_numbers[tool_id] / _tool_names[number]: tool ids interned to small ints;
+      scoring works on numbers and rank() decodes only the returned tools
 
     Field weights default: name=3.0, keywords=2.0, aliases=1.8, description=1.0
     """
 
     def __init__(self, field_weights: MutableMapping[Field, float] | None = None) -> None:
-        self.term_to_tools: Dict[str, Dict[str, Dict[Field, int]]] = {}
+        self.term_to_tools: Dict[str, Dict[str, int]] = {}
         self.df: Dict[str, int] = {}
         self.tools: Set[str] = set()
+        self.tool_terms: Dict[str, Set[str]] = {}
+        self._columns: Dict[str, _Column] = {}
+        # term -> {anchor mask: tool numbers with an anchor-field hit}, derived from _columns
+        self._anchor_tools: Dict[str, Dict[int, FrozenSet[int]]] = {}
+        # field_weights the columns were built with (mutating the dict invalidates them)
+        self._columns_weights: Optional[Tuple[Tuple[Field, float], ...]] = None
+        # (shift, weight, FIELD_BITS bit) per lane, from field_weights at the last sync
+        self._lanes: Tuple[Tuple[int, float, int], ...] = ()
+        self._tool_numbers: Dict[str, int] = {}
+        self._tool_names: List[str] = []
         self.field_weights: Dict[Field, float] = {
             "name": 3.0,
             "keywords": 2.0,
@@ -35,31 +104,127 @@ class InvertedIndex:
     # --- Build ---
     def add_tool(self, tool_id: str, terms_by_field: Dict[Field, Iterable[str]]) -> None:
         """Add a tool to the index using pre-tokenized terms by field."""
+        # validate up front so a bad field never leaves a half-posted tool behind
+        for field in terms_by_field:
+            if field not in FIELD_SHIFTS:
+                raise ValueError(f"Unknown field {field!r}; expected one of {list(FIELD_SHIFTS)}")
         self.tools.add(tool_id)
+        if tool_id not in self._tool_numbers:
+            self._tool_numbers[tool_id] = len(self._tool_names)
+            self._tool_names.append(tool_id)
 
-        # compute tf per term per field for this tool
-        per_field_counts: Dict[Field, Dict[str, int]] = {}
-        for field, terms in terms_by_field.items():
-            counts: DefaultDict[str, int] = defaultdict(int)
-            for t in terms:
-                if not t:
-                    continue
-                counts[t] += 1
-            if counts:
-                per_field_counts[field] = dict(counts)
-
-        # update postings and df (per tool unique)
+        # tf per term per field (Counter counts in C), posted as we go
         seen_terms_for_df: Set[str] = set()
-        for field, counts in per_field_counts.items():
+        for field, terms in terms_by_field.items():
+            counts = Counter(filter(None, terms))
+            if not counts:
+                continue
+            shift = FIELD_SHIFTS[field]
             for term, tf in counts.items():
                 tool_map = self.term_to_tools.setdefault(term, {})
-                field_map = tool_map.setdefault(tool_id, {})
-                field_map[field] = field_map.get(field, 0) + tf
-                if term not in seen_terms_for_df:
-                    self.df[term] = self.df.get(term, 0) + 1
-                    seen_terms_for_df.add(term)
+                packed = tool_map.get(tool_id, 0)
+                lane = (packed >> shift) & _LANE_MAX
+                tool_map[tool_id] = packed + ((min(lane + tf, _LANE_MAX) - lane) << shift)
+            seen_terms_for_df.update(counts)
+
+        # update df (per tool unique)
+        for term in seen_terms_for_df:
+            self.df[term] = self.df.get(term, 0) + 1
+            self._columns.pop(term, None)
+            self._anchor_tools.pop(term, None)
+        self.tool_terms.setdefault(tool_id, set()).update(seen_terms_for_df)
+
+    def remove_tool(self, tool_id: str) -> None:
+        """Remove a tool's postings and df contributions."""
+        self.tools.discard(tool_id)
+        for term in self.tool_terms.pop(tool_id, ()):
+            self._columns.pop(term, None)
+            self._anchor_tools.pop(term, None)
+            tool_map = self.term_to_tools.get(term)
+            if not tool_map or tool_map.pop(tool_id, None) is None:
+                continue
+            if tool_map:
+                self.df[term] -= 1
+            else:
+                del self.term_to_tools[term]
+                self.df.pop(term, None)
+
+    def finalize(self) -> None:
+        """Build the postings columns of every term now instead of on first query use."""
+        self._sync_field_weights()
+        for term in self.term_to_tools.keys() - self._columns.keys():
+            self._column(term)
 
     # --- Query ---
+    def _sync_field_weights(self) -> None:
+        """Drop columns built with field_weights that have since been changed."""
+        weights_key = tuple(self.field_weights.items())
+        if weights_key != self._columns_weights:
+            self._columns.clear()
+            self._anchor_tools.clear()
+            self._columns_weights = weights_key
+            self._lanes = tuple(
+                (FIELD_SHIFTS[field], self.field_weights.get(field, 1.0), FIELD_BITS[field])
+                for field in _LANE_FIELDS
+            )
+
+    def _column(self, term: str) -> Optional[_Column]:
+        """Return the term's postings as parallel columns, building them on first use.
+
+        Callers run _sync_field_weights() first so the lane weights are current.
+        """
+        column = self._columns.get(term)
+        if column is None:
+            tmap = self.term_to_tools.get(term)
+            if not tmap:
+                return None
+            lanes = self._lanes
+            tool_numbers = self._tool_numbers
+            numbers = array("i")
+            weights = array("d")
+            masks = array("B")
+            # sorted by tool number: a docid-ordered sequential scan
+            for number, packed in sorted((tool_numbers[t], p) for t, p in tmap.items()):
+                weight = 0.0
+                mask = 0
+                for shift, field_weight, bit in lanes:
+                    tf = (packed >> shift) & _LANE_MAX
+                    if tf:
+                        weight += tf * field_weight
+                        mask |= bit
+                numbers.append(number)
+                weights.append(weight)
+                masks.append(mask)
+            column = self._columns[term] = (numbers, weights, masks)
+        return column
+
+    def anchor_candidates(
+        self, terms: Iterable[str], anchor_fields: Sequence[Field] = ("name", "keywords", "aliases")
+    ) -> Set[int]:
+        """Tool numbers matching any of `terms` in an anchor field.
+
+        With require_anchor, only these tools can survive rank(), so accumulate()
+        can skip every other posting.
+        """
+        self._sync_field_weights()
+        anchor_mask = _fields_mask(tuple(anchor_fields))
+        candidates: Set[int] = set()
+        for term in terms:
+            column = self._column(term)
+            if column is None:
+                continue  # unknown terms are not cached, so typos cannot grow the index
+            by_mask = self._anchor_tools.get(term)
+            if by_mask is None:
+                by_mask = self._anchor_tools[term] = {}
+            anchored = by_mask.get(anchor_mask)
+            if anchored is None:
+                numbers, _, masks = column
+                anchored = by_mask[anchor_mask] = frozenset(
+                    compress(numbers, [mask & anchor_mask for mask in masks])
+                )
+            candidates |= anchored
+        return candidates
+
     def _idf(self, term: str) -> float:
         N = len(self.tools)
         df = self.df.get(term, 0)
@@ -77,73 +242,142 @@ class InvertedIndex:
         top_k: int = 3,
         min_complete_hits: Optional[int] = None,
         query_terms: Optional[Set[str]] = None,
-    ) -> List[Tuple[str, float, Dict[str, List[Field]]]]:
+    ) -> List[Tuple[str, float, Dict[str, int]]]:
         """Return ranked tools for the given query terms.
 
         - complete_terms: tokens fully typed by the user (used for intersection threshold)
         - expanded_terms: expansions for the last prefix via trie
         - require_anchor: at least one matched term must come from an anchor field
         - alpha: fraction of complete_terms that must be matched by a tool
-        - returns: list of (tool_id, score, contributions {term: [fields...]})
+        - returns: list of (tool_id, score, contributions {term: FIELD_BITS mask})
         """
+        # one set of complete terms, probed once per query term by accumulate()
+        complete_terms = set(complete_terms)
         if query_terms is not None:
             query_terms = set(query_terms)
         else:
-            query_terms = set(complete_terms) | set(expanded_terms)
+            query_terms = complete_terms.union(expanded_terms)
         if not query_terms:
             return []
 
-        # gather candidate tools
-        candidates: Set[str] = set()
-        for term in query_terms:
-            tmap = self.term_to_tools.get(term)
-            if tmap:
-                candidates.update(tmap.keys())
-
         if min_complete_hits is not None:
             required = max(0, int(min_complete_hits))
         else:
             required = int(math.ceil(len(complete_terms) * max(0.0, min(1.0, alpha))))
-        results: List[Tuple[str, float, Dict[str, List[Field]]]] = []
-
-        for tool_id in candidates:
-            contributions: Dict[str, List[Field]] = {}
-            score = 0.0
-            matched_complete = 0
-            anchor_hit = False
-
-            for term in query_terms:
-                tmap = self.term_to_tools.get(term)
-                if not tmap:
-                    continue
-                fmap = tmap.get(tool_id)
-                if not fmap:
-                    continue
-
-                # track fields for explaining
-                for field, tf in fmap.items():
-                    if field in anchor_fields:
-                        anchor_hit = True
-                    # scoring
-                    score += float(tf) * self.field_weights.get(field, 1.0) * self._idf(term)
-                    contributions.setdefault(term, [])
-                    if field not in contributions[term]:
-                        contributions[term].append(field)
-
-                # count matched complete terms
-                if term in complete_terms:
-                    matched_complete += 1
-
-            if require_anchor and not anchor_hit:
+        candidates = self.anchor_candidates(query_terms, anchor_fields) if require_anchor else None
+        return self.rank(
+            self.accumulate(query_terms, complete_terms=complete_terms, candidates=candidates),
+            required=required,
+            require_anchor=require_anchor,
+            anchor_fields=anchor_fields,
+            min_score=min_score,
+            top_k=top_k,
+        )
+
+    def accumulate(
+        self,
+        terms: Iterable[str],
+        *,
+        complete_terms: AbstractSet[str],
+        candidates: Optional[AbstractSet[int]] = None,
+    ) -> Partial:
+        """Score `terms` per tool without filtering; returns a Partial keyed by tool number.
+
+        Partials over disjoint term sets can be combined with merge_partials, letting
+        callers reuse the partial of terms that did not change between queries.
+        `candidates` (e.g. from anchor_candidates) restricts scoring to those tools.
+        """
+        # Term-at-a-time over column-wise postings: each (term, tool) pair costs one
+        # multiply-add, with tf × field weight and the field mask prebaked per term.
+        self._sync_field_weights()
+        acc: Dict[int, List] = {}  # tool number -> Partial entry (mutable while accumulating)
+        for term in set(terms):
+            column = self._column(term)
+            if column is None:
+                continue
+            idf = self._idf(term)  # once per term
+            hit = 1 if term in complete_terms else 0  # per term, not per posting
+            _score_column(acc, column, term, idf, hit, candidates)
+
+        return {number: tuple(entry) for number, entry in acc.items()}
+
+    def rank(
+        self,
+        partial: Partial,
+        *,
+        required: int = 0,
+        require_anchor: bool = True,
+        anchor_fields: Sequence[Field] = ("name", "keywords", "aliases"),
+        min_score: float = 1.0,
+        top_k: int = 3,
+    ) -> List[Tuple[str, float, Dict[str, int]]]:
+        """Filter and sort a partial into ranked (tool_id, score, contributions)."""
+        anchor_mask = _fields_mask(tuple(anchor_fields))
+        results: List[Tuple[int, float, Dict[str, int]]] = []
+
+        for number, (score, matched_complete, contributions, fields) in partial.items():
+            if require_anchor and not fields & anchor_mask:
                 continue
             if matched_complete < required:
                 continue
             if score < float(min_score):
                 continue
 
-            results.append((tool_id, score, contributions))
+            results.append((number, score, contributions))
 
-        results.sort(key=lambda x: x[1], reverse=True)
         if top_k is not None and top_k > 0:
-            results = results[:top_k]
-        return results
+            # keep only top_k scores around instead of sorting every survivor
+            results = heapq.nlargest(top_k, results, key=_score_key)
+        else:
+            results.sort(key=_score_key, reverse=True)
+        names = self._tool_names
+        return [(names[number], score, contributions) for number, score, contributions in results]
+
+
+def _score_column(
+    acc: Dict[int, List],
+    column: _Column,
+    term: str,
+    idf: float,
+    hit: int,
+    candidates: Optional[AbstractSet[int]] = None,
+) -> None:
+    """Scoring kernel: add one term's postings into `acc` (number -> Partial entry as a list).
+
+    Kept free of index state so the hot loop only touches locals. With `candidates`,
+    postings of other tools are skipped.
+    """
+    acc_get = acc.get
+    postings: Iterable[Tuple[int, float, int]] = zip(*column)
+    if candidates is not None:
+        postings = compress(postings, map(candidates.__contains__, column[0]))
+    for number, weight, mask in postings:
+        entry = acc_get(number)
+        if entry is None:
+            acc[number] = [weight * idf, hit, {term: mask}, mask]
+        else:
+            entry[0] += weight * idf
+            entry[1] += hit
+            entry[2][term] = mask
+            entry[3] |= mask
+
+
+def merge_partials(base: Partial, extra: Partial) -> Partial:
+    """Combine partials accumulated over disjoint term sets (inputs are not mutated)."""
+    if not extra:
+        return base
+    if not base:
+        return extra
+    merged = dict(base)
+    for number, entry in extra.items():
+        prev = merged.get(number)
+        if prev is None:
+            merged[number] = entry
+        else:
+            merged[number] = (
+                prev[0] + entry[0],
+                prev[1] + entry[1],
+                {**prev[2], **entry[2]},
+                prev[3] | entry[3],
+            )
+    return merged
@@ -1,11 +1,16 @@
 from __future__ import annotations
 
 import re
+import string
 import unicodedata
-from typing import Iterable, List, Sequence, Set, Tuple
+from functools import lru_cache
+from typing import FrozenSet, Iterable, List, Sequence, Tuple
 
 
 _WORD = re.compile(r"\w+", re.UNICODE)
+_NO_STOPWORDS: FrozenSet[str] = frozenset()
+# Normalized text made only of these splits on " " into exactly its \w+ runs
+_PLAIN_WORD_CHARS = frozenset(string.ascii_lowercase + string.digits + "_ ")
 
 # Minimal multilingual stopword lists (extendable via locales).
 _STOPWORDS = {
@@ -83,15 +88,15 @@ def _normalize_locale(locale: str) -> str:
     return locale.split("-")[0].lower()
 
 
-def stopwords(locales: Sequence[str] | None = None) -> Set[str]:
+def stopwords(locales: Sequence[str] | None = None) -> FrozenSet[str]:
     """Return stopwords for the provided locales (language codes)."""
-    locales = locales or ("pt", "en")
-    acc: Set[str] = set()
-    for loc in locales:
-        bucket = _STOPWORDS.get(_normalize_locale(loc))
-        if bucket:
-            acc.update(bucket)
-    return acc
+    return _stopwords_for(tuple(locales or ("pt", "en")))
+
+
+@lru_cache(maxsize=32)
+def _stopwords_for(locales: Tuple[str, ...]) -> FrozenSet[str]:
+    buckets = (_STOPWORDS.get(_normalize_locale(loc)) for loc in locales)
+    return frozenset().union(*(bucket for bucket in buckets if bucket))
 
 
 def _is_noise(token: str) -> bool:
@@ -106,18 +111,39 @@ def _is_noise(token: str) -> bool:
     return False
 
 
+def _strip_accents(text: str) -> str:
+    text = unicodedata.normalize("NFKD", text)
+    return "".join(ch for ch in text if not unicodedata.combining(ch))
+
+
+# ASCII plus accented Latin letters whose NFKD form is ASCII + combining marks
+# (á, ç, ñ, ...): for text made only of these, dropping non-ASCII after NFKD
+# strips exactly the combining marks, all in C.
+_ASCII_FOLDABLE = frozenset(map(chr, range(0x80))) | frozenset(
+    ch
+    for ch in map(chr, range(0x80, 0x250))
+    if (stripped := _strip_accents(ch)) != ch and stripped.isascii()
+)
+
+
+@lru_cache(maxsize=4096)
 def normalize(text: str) -> str:
     """Normalize text: lowercase, strip accents, trim whitespace.
 
     - Lowercases
-    - Removes diacritics (NFKD)
+    - Removes diacritics (NFKD); the per-character filter only runs for text
+      outside the ASCII/accented-Latin fast paths
     - Collapses whitespace
+
+    Results are memoized (LRU) by input text.
     """
     text = text.lower()
-    text = unicodedata.normalize("NFKD", text)
-    text = "".join(ch for ch in text if not unicodedata.combining(ch))
-    text = " ".join(text.split())
-    return text
+    if not text.isascii():
+        if _ASCII_FOLDABLE.issuperset(text):
+            text = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode("ascii")
+        else:
+            text = _strip_accents(text)
+    return " ".join(text.split())
 
 
 def tokens_with_spans(
@@ -132,22 +158,44 @@ def tokens_with_spans(
 
     Note: spans are relative to the normalized string returned by normalize().
     """
-    norm = normalize(text)
-    stopword_set: Set[str] = set()
+    stopword_set: FrozenSet[str] = _NO_STOPWORDS
     if drop_stopwords:
-        stopword_set.update(stopwords(locales))
+        stopword_set = stopwords(locales)
         if extra_stopwords:
-            stopword_set.update(extra_stopwords)
+            stopword_set = stopword_set.union(extra_stopwords)
+    # the cache holds tuples; callers get their own list
+    return list(_token_spans(text, stopword_set, remove_noise))
+
 
+@lru_cache(maxsize=4096)
+def _token_spans(
+    text: str, stopword_set: FrozenSet[str], remove_noise: bool
+) -> Tuple[Tuple[str, Tuple[int, int]], ...]:
+    norm = normalize(text)
+    is_noise = _is_noise
     items: List[Tuple[str, Tuple[int, int]]] = []
-    for match in _WORD.finditer(norm):
-        tok = match.group(0)
-        if remove_noise and _is_noise(tok):
+    for tok, span in _words(norm):
+        if remove_noise and is_noise(tok):
             continue
-        if drop_stopwords and tok in stopword_set:
+        if tok in stopword_set:
             continue
-        items.append((tok, match.span()))
-    return items
+        items.append((tok, span))
+    return tuple(items)
+
+
+def _words(norm: str) -> List[Tuple[str, Tuple[int, int]]]:
+    """Word runs (as matched by _WORD) of normalized text, with their spans."""
+    if not _PLAIN_WORD_CHARS.issuperset(norm):
+        return [(match.group(0), match.span()) for match in _WORD.finditer(norm)]
+    # Only ASCII word characters separated by single spaces (normalize collapses
+    # whitespace): str.split finds the same runs without a match object per word.
+    words: List[Tuple[str, Tuple[int, int]]] = []
+    start = 0
+    for word in norm.split(" ") if norm else ():
+        end = start + len(word)
+        words.append((word, (start, end)))
+        start = end + 1
+    return words
 
 
 def tokens(
@@ -1,50 +1,63 @@
 from __future__ import annotations
 
-from dataclasses import dataclass, field
-from typing import Dict, Iterable, List, Optional, Set
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional
 
-
-@dataclass
-class TrieNode:
-    children: Dict[str, "TrieNode"] = field(default_factory=dict)
-    terminal: bool = False
-    terms: Set[str] = field(default_factory=set)
-    # descendant terms for prefix search
-    desc_terms: Set[str] = field(default_factory=set)
+# Sorts after any character of a normalized term: prefix + _MAX_CHAR bounds the prefix range
+_MAX_CHAR = "\U0010ffff"
 
 
 class Trie:
-    """Character trie for complete terms.
+    """Prefix index over complete terms.
 
-    Each inserted term is added as terminal; we maintain `desc_terms` to
-    quickly return all terms that share a prefix.
+    Terms are kept in one sorted list, so all terms sharing a prefix form a
+    contiguous range found with two bisects. The list is re-sorted lazily on the
+    first lookup after insertions. Insertions are reference counted so a term
+    shared by several tools survives until its last delete.
     """
 
     def __init__(self) -> None:
-        self.root = TrieNode()
+        self._counts: Dict[str, int] = {}
+        self._sorted: List[str] = []
+        self._dirty = False
 
     def insert(self, term: str) -> None:
-        node = self.root
-        node.desc_terms.add(term)
-        for ch in term:
-            node = node.children.setdefault(ch, TrieNode())
-            node.desc_terms.add(term)
-        node.terminal = True
-        node.terms.add(term)
+        count = self._counts.get(term, 0)
+        self._counts[term] = count + 1
+        if not count:
+            self._dirty = True
 
     def bulk_insert(self, terms: Iterable[str]) -> None:
         for t in terms:
             if t:
                 self.insert(t)
 
+    def delete(self, term: str) -> None:
+        """Drop one insertion of term; the term disappears when its count reaches zero."""
+        count = self._counts.get(term, 0)
+        if count > 1:
+            self._counts[term] = count - 1
+            return
+        if not count:
+            return
+        del self._counts[term]
+        if not self._dirty:
+            del self._sorted[bisect_left(self._sorted, term)]
+
+    def __contains__(self, term: str) -> bool:
+        return term in self._counts
+
+    def _terms(self) -> List[str]:
+        if self._dirty:
+            self._sorted = sorted(self._counts)
+            self._dirty = False
+        return self._sorted
+
     def prefix_terms(self, prefix: str, *, limit: Optional[int] = None) -> List[str]:
-        node = self.root
-        for ch in prefix:
-            if ch not in node.children:
-                return []
-            node = node.children[ch]
-        terms = list(node.desc_terms)
+        """Return terms starting with prefix in lexicographic order (first `limit` of them)."""
+        terms = self._terms()
+        lo = bisect_left(terms, prefix)
+        hi = bisect_left(terms, prefix + _MAX_CHAR, lo)
         if limit is not None:
-            return terms[:limit]
-        return terms
-
+            hi = min(hi, lo + max(0, limit))
+        return terms[lo:hi]
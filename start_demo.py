@@ -6,7 +6,9 @@ Starts both the Python gateway backend and the React frontend dev server.
 Handles graceful shutdown and cross-platform compatibility.
 """
 
+import errno
 import os
+import selectors
 import sys
 import signal
 import subprocess
@@ -21,14 +23,43 @@ def is_port_in_use(port: int) -> bool:
         return s.connect_ex(('127.0.0.1', port)) == 0
 
 
+# connect_ex results meaning "connection in progress" on a non-blocking socket
+_CONNECT_PENDING = {errno.EINPROGRESS, errno.EWOULDBLOCK, errno.EALREADY}
+if hasattr(errno, "WSAEWOULDBLOCK"):  # Windows
+    _CONNECT_PENDING.add(errno.WSAEWOULDBLOCK)
+
+
+def _try_connect(port: int, wait: float) -> bool:
+    """One non-blocking connect to localhost, waiting up to `wait` seconds for it."""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s, selectors.DefaultSelector() as sel:
+        s.setblocking(False)
+        result = s.connect_ex(('127.0.0.1', port))
+        if result == 0:
+            return True
+        if result not in _CONNECT_PENDING:
+            return False  # refused: nothing listening yet
+        sel.register(s, selectors.EVENT_WRITE)
+        if not sel.select(wait):
+            return False
+        return s.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR) == 0
+
+
 def wait_for_port(port: int, timeout: int = 30) -> bool:
-    """Wait for a port to become available."""
-    start = time.time()
-    while time.time() - start < timeout:
-        if is_port_in_use(port):
+    """Wait for a port to start accepting connections.
+
+    Retries with exponential backoff (50ms doubling up to 500ms) so fast-starting
+    servers are detected promptly without hammering slow ones.
+    """
+    deadline = time.monotonic() + timeout
+    delay = 0.05
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        if _try_connect(port, remaining):
             return True
-        time.sleep(0.5)
-    return False
+        time.sleep(min(delay, max(0.0, deadline - time.monotonic())))
+        delay = min(delay * 2, 0.5)
 
 
 def main():
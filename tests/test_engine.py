@@ -18,3 +18,95 @@ def test_engine_suggests_export_csv():
     assert suggestions, "Should suggest at least one tool"
     assert suggestions[0]["id"] == "export_csv"
 
+
+
+def test_engine_cache_is_invalidated_by_catalog_changes():
+    eng = SuggestionEngine(
+        [{"name": "export_csv", "description": "Exporta CSV", "keywords": ["exportar", "csv"]}]
+    )
+    assert eng.submit("csv", session_id="s1")[0]["id"] == "export_csv"
+
+    eng.remove_tool("export_csv")
+    assert eng.submit("csv", session_id="s1") == []
+
+    eng.add_tools([{"name": "csv_writer", "description": "Grava CSV", "keywords": ["csv"]}])
+    assert eng.submit("csv", session_id="s1")[0]["id"] == "csv_writer"
+
+
+def test_engine_cached_results_are_not_shared():
+    eng = SuggestionEngine(
+        [{"name": "export_csv", "description": "x", "keywords": ["csv"], "tags": ["data"]}]
+    )
+    first = eng.submit("csv", session_id="s1")
+    first[0]["score"] = -1.0
+    first[0]["metadata"]["tags"].append("mutated")
+    first[0]["metadata"]["extra"] = True
+    first[0]["arguments_template"]["path"] = "x.csv"
+
+    second = eng.submit("csv", session_id="s2")[0]
+    assert second["score"] > 0
+    assert second["metadata"] == {"tags": ["data"]}
+    assert second["arguments_template"] == {}
+
+    eng.add_tools([{"name": "csv_notes", "description": "x", "keywords": ["csv"], "tags": None}])
+    notes = [s for s in eng.submit("csv", session_id="s3") if s["id"] == "csv_notes"]
+    assert notes[0]["metadata"] == {"tags": None}
+
+
+def test_remove_tool_keeps_shared_terms_for_remaining_tools():
+    eng = SuggestionEngine(
+        [
+            {"name": "export_csv", "description": "Exporta CSV", "keywords": ["exportar", "csv"]},
+            {"name": "csv_reader", "description": "Le arquivos", "keywords": ["csv", "ler"]},
+        ]
+    )
+    eng.remove_tool("export_csv")
+
+    assert [s["id"] for s in eng.feed("cs", session_id="s1")] == ["csv_reader"]
+    assert eng.submit("exportar", session_id="s2") == []
+    assert eng.submit("expor", session_id="s3") == []
+
+
+def test_re_adding_a_tool_replaces_it():
+    eng = SuggestionEngine(
+        [{"name": "export_csv", "description": "Exporta CSV", "keywords": ["exportar", "csv"]}]
+    )
+    eng.add_tools([{"name": "export_csv", "description": "Grava", "keywords": ["csv"]}])
+
+    assert eng.submit("exportar", session_id="s1") == []
+    assert eng.submit("csv", session_id="s2")[0]["id"] == "export_csv"
+
+    eng.remove_tool("export_csv")
+
+    assert eng.submit("csv", session_id="s3") == []
+    assert eng.feed("cs", session_id="s4") == []
+    assert "csv" not in eng._trie
+
+
+def test_engine_pickle_roundtrip_keeps_index_and_drops_sessions():
+    import pickle
+
+    eng = SuggestionEngine(
+        [{"name": "export_csv", "description": "Exporta CSV", "keywords": ["exportar", "csv"]}]
+    )
+    eng.feed("expor", session_id="s1")
+
+    clone = pickle.loads(pickle.dumps(eng, protocol=pickle.HIGHEST_PROTOCOL))
+
+    expected = eng.submit("exportar csv", session_id="s2")
+    assert clone.submit("exportar csv", session_id="s2") == expected
+    assert [s["id"] for s in clone.feed("t", session_id="s1")] == []
+
+
+def test_feed_keystrokes_match_submit_of_full_text():
+    eng = SuggestionEngine(
+        [
+            {"name": "export_csv", "description": "Exporta CSV", "keywords": ["exportar", "csv"]},
+            {"name": "send_email", "description": "Envia email", "keywords": ["enviar", "email"]},
+        ],
+        max_intents=2,
+    )
+    text = "Exportar  CSV e  ENVIAR e-mail\tdepois"
+    for i in range(1, len(text) + 1):
+        fed = eng.feed(text[i - 1], session_id="typing")
+        assert fed == eng.submit(text[:i], session_id="fresh")
@@ -1,4 +1,12 @@
-from suggester.inverted_index import InvertedIndex
+import pytest
+
+from suggester.inverted_index import (
+    FIELD_BITS,
+    FIELD_MASK_LABELS,
+    FIELD_SHIFTS,
+    InvertedIndex,
+    merge_partials,
+)
 
 
 def test_inverted_index_anchor_and_scoring():
@@ -40,3 +48,133 @@ def test_inverted_index_anchor_and_scoring():
     )
     assert ranked_desc == []
 
+
+
+def test_inverted_index_remove_tool_drops_postings_and_df():
+    idx = InvertedIndex()
+    idx.add_tool("export_csv", {"name": ["export_csv"], "keywords": ["exportar", "csv"]})
+    idx.add_tool("csv_writer", {"name": ["csv_writer"], "keywords": ["csv"]})
+    assert idx.df["csv"] == 2
+
+    idx.remove_tool("export_csv")
+
+    assert idx.tools == {"csv_writer"}
+    assert idx.df["csv"] == 1
+    assert "exportar" not in idx.term_to_tools
+    assert "exportar" not in idx.df
+    ranked = idx.query(complete_terms=set(), expanded_terms={"csv"}, top_k=3)
+    assert [tool_id for tool_id, _, _ in ranked] == ["csv_writer"]
+
+
+def test_inverted_index_postings_columns_follow_index_changes():
+    idx = InvertedIndex()
+    idx.add_tool("csv_writer", {"name": ["csv_writer"], "keywords": ["csv"]})
+    assert [t for t, _, _ in idx.query(complete_terms=set(), expanded_terms={"csv"})] == [
+        "csv_writer"
+    ]
+
+    idx.add_tool("csv_reader", {"keywords": ["csv", "csv"]})
+    ranked = idx.query(complete_terms=set(), expanded_terms={"csv"})
+    assert [t for t, _, _ in ranked] == ["csv_reader", "csv_writer"]
+
+    idx.remove_tool("csv_reader")
+    ranked = idx.query(complete_terms=set(), expanded_terms={"csv"})
+    assert [t for t, _, _ in ranked] == ["csv_writer"]
+
+
+def test_inverted_index_contributions_are_field_masks():
+    idx = InvertedIndex()
+    idx.add_tool("export_csv", {"description": ["csv"], "keywords": ["csv"], "aliases": []})
+
+    [(_, _, contrib)] = idx.query(complete_terms=set(), expanded_terms={"csv"})
+
+    assert contrib == {"csv": FIELD_BITS["keywords"] | FIELD_BITS["description"]}
+    assert FIELD_MASK_LABELS[contrib["csv"]] == "description,keywords"
+
+
+def test_inverted_index_merged_partials_match_full_query():
+    idx = InvertedIndex()
+    idx.add_tool("export_csv", {"name": ["export_csv"], "keywords": ["exportar", "csv"]})
+    idx.add_tool("csv_reader", {"name": ["csv_reader"], "keywords": ["csv", "ler"]})
+    complete = {"exportar"}
+
+    partial = merge_partials(
+        idx.accumulate(complete, complete_terms=complete),
+        idx.accumulate({"csv"}, complete_terms=complete),
+    )
+
+    full = idx.query(complete_terms=complete, expanded_terms={"csv"}, min_score=0.0)
+    assert idx.rank(partial, required=1, min_score=0.0) == full
+
+
+def test_inverted_index_field_weight_changes_rebuild_columns():
+    idx = InvertedIndex()
+    idx.add_tool("by_name", {"name": ["csv"]})
+    idx.add_tool("by_keyword", {"keywords": ["csv"]})
+    ranked = idx.query(complete_terms=set(), expanded_terms={"csv"})
+    assert [t for t, _, _ in ranked] == ["by_name", "by_keyword"]
+
+    idx.field_weights["keywords"] = 5.0
+    ranked = idx.query(complete_terms=set(), expanded_terms={"csv"})
+    assert [t for t, _, _ in ranked] == ["by_keyword", "by_name"]
+
+
+def test_inverted_index_packs_field_tf_into_lanes():
+    idx = InvertedIndex()
+    idx.add_tool("export_csv", {"name": ["csv"], "description": ["csv"] * 300, "aliases": []})
+
+    packed = idx.term_to_tools["csv"]["export_csv"]
+    assert (packed >> FIELD_SHIFTS["name"]) & 0xFF == 1
+    assert (packed >> FIELD_SHIFTS["keywords"]) & 0xFF == 0
+    assert (packed >> FIELD_SHIFTS["description"]) & 0xFF == 255  # capped lane
+
+    [(_, score, contrib)] = idx.query(complete_terms=set(), expanded_terms={"csv"})
+    assert contrib == {"csv": FIELD_BITS["name"] | FIELD_BITS["description"]}
+    assert score == (1 * 3.0 + 255 * 1.0) * idx._idf("csv")
+
+
+def test_inverted_index_finalize_builds_all_columns():
+    idx = InvertedIndex()
+    idx.add_tool("export_csv", {"name": ["export_csv"], "keywords": ["exportar", "csv"]})
+    idx.finalize()
+
+    assert set(idx._columns) == {"export_csv", "exportar", "csv"}
+    before = idx.query(complete_terms=set(), expanded_terms={"csv"})
+    idx.add_tool("csv_writer", {"keywords": ["csv"]})
+    assert "csv" not in idx._columns
+    assert len(idx.query(complete_terms=set(), expanded_terms={"csv"})) == len(before) + 1
+
+
+def test_inverted_index_anchor_candidates_skip_description_only_tools():
+    idx = InvertedIndex()
+    idx.add_tool("export_csv", {"keywords": ["exportar"], "description": ["csv"]})
+    idx.add_tool("csv_notes", {"description": ["csv", "exportar"]})
+    number = idx._tool_numbers["export_csv"]
+
+    assert idx.anchor_candidates({"csv", "exportar"}) == {number}
+    partial = idx.accumulate({"csv"}, complete_terms=set(), candidates={number})
+    assert list(partial) == [number]
+
+    ranked = idx.query(complete_terms={"exportar"}, expanded_terms={"csv"})
+    assert [t for t, _, _ in ranked] == ["export_csv"]
+    assert ranked[0][2] == {"exportar": FIELD_BITS["keywords"], "csv": FIELD_BITS["description"]}
+
+
+def test_inverted_index_anchor_candidates_do_not_cache_unknown_terms():
+    idx = InvertedIndex()
+    idx.add_tool("export_csv", {"keywords": ["exportar"]})
+    number = idx._tool_numbers["export_csv"]
+
+    assert idx.anchor_candidates({"exportar", "xyzzy", "qwerty"}) == {number}
+    assert set(idx._anchor_tools) == {"exportar"}
+
+
+def test_inverted_index_unknown_field_leaves_index_untouched():
+    idx = InvertedIndex()
+
+    with pytest.raises(ValueError):
+        idx.add_tool("t", {"name": ["csv"], "tags": ["x"]})
+
+    assert idx.tools == set()
+    assert idx.term_to_tools == {}
+    assert idx.query(complete_terms=set(), expanded_terms={"csv"}) == []
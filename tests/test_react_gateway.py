@@ -0,0 +1,112 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("httpx")
+pytest.importorskip("orjson")
+pytest.importorskip("uvicorn")
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from suggester.adapters import react_gateway as gw  # noqa: E402
+
+
+@pytest.fixture
+def gateway(monkeypatch):
+    """Gateway app with its module state restored after the test."""
+    monkeypatch.setattr(gw, "INDEX_CACHE_PATH", None)
+    monkeypatch.setattr(gw, "current_config", dict(gw.current_config))
+    monkeypatch.setattr(gw, "_engine", None)
+    return gw
+
+
+def test_config_update_builds_off_the_event_loop(gateway, monkeypatch):
+    build_threads = []
+    rebuilding = threading.Event()
+
+    class SlowEngine(gw.SuggestionEngine):
+        def __init__(self, *args, **kwargs):
+            build_threads.append(threading.current_thread().name)
+            if len(build_threads) > 1:
+                rebuilding.set()
+                time.sleep(0.3)
+            super().__init__(*args, **kwargs)
+
+    monkeypatch.setattr(gateway, "SuggestionEngine", SlowEngine)
+    with TestClient(gateway.app) as client, ThreadPoolExecutor(max_workers=1) as pool:
+        update = pool.submit(client.post, "/api/config", json={"top_k": 4})
+        assert rebuilding.wait(5)
+
+        assert client.get("/health").json()["engine_initialized"] is True
+        response = client.post("/api/suggest", json={"text": "exportar csv"})
+        assert response.json()["suggestions"][0]["id"] == "export_csv"
+        assert update.result().status_code == 200
+
+    assert len(build_threads) == 2
+    assert all(name.startswith("suggester-engine") for name in build_threads)
+    assert gateway.current_config["top_k"] == 4
+
+
+def test_websocket_replies_only_reach_the_requesting_connection(gateway):
+    with TestClient(gateway.app) as client:
+        with client.websocket_connect("/ws/suggest") as a, client.websocket_connect(
+            "/ws/suggest"
+        ) as b:
+            b.send_json({"type": "subscribe", "session_id": "shared"})
+            b.send_json({"type": "ping", "session_id": "shared", "timestamp": 1})
+            assert b.receive_json(mode="binary") == {"type": "pong", "timestamp": 1}
+
+            a.send_json({"type": "submit", "session_id": "shared", "text": "exportar csv"})
+            assert a.receive_json(mode="binary")["type"] == "suggestions"
+
+            b.send_json({"type": "ping", "timestamp": 2})
+            assert b.receive_json(mode="binary") == {"type": "pong", "timestamp": 2}
+    assert gateway._subscribers == {}
+
+
+def test_broadcast_sends_one_payload_to_every_registered_socket(gateway, monkeypatch):
+    class FakeSocket:
+        def __init__(self, fail=False):
+            self.fail = fail
+            self.frames = []
+
+        async def send_bytes(self, payload):
+            if self.fail:
+                raise RuntimeError("closed")
+            self.frames.append(payload)
+
+    monkeypatch.setattr(gateway, "_subscribers", {})
+    first, second, closed = FakeSocket(), FakeSocket(), FakeSocket(fail=True)
+    gateway._subscribe("s1", first)
+    gateway._subscribe("s1", closed)
+    gateway._subscribe("s2", second)
+
+    asyncio.run(gateway.broadcast(("s1", "s2"), b"frame"))
+
+    assert first.frames == second.frames == [b"frame"]
+
+
+def test_feed_deltas_coalesce_per_connection(gateway, monkeypatch):
+    monkeypatch.setattr(gateway, "FEED_DEBOUNCE_SECONDS", 0.2)
+    with TestClient(gateway.app) as client:
+        with client.websocket_connect("/ws/suggest") as a, client.websocket_connect(
+            "/ws/suggest"
+        ) as b:
+            for delta in ("expor", "tar ", "csv"):
+                a.send_json({"type": "feed", "delta": delta})
+            b.send_json({"type": "feed", "delta": "enviar email"})
+
+            frame = a.receive_json(mode="binary")
+            assert frame["type"] == "suggestions"
+            assert frame["suggestions"][0]["id"] == "export_csv"
+            assert b.receive_json(mode="binary")["type"] == "suggestions"
+
+            # the three deltas produced a single frame
+            a.send_json({"type": "ping", "timestamp": 1})
+            assert a.receive_json(mode="binary") == {"type": "pong", "timestamp": 1}
+    assert gateway._pending_feeds == {}
+    assert gateway._pending_deltas == {}
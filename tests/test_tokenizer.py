@@ -1,4 +1,4 @@
-from suggester.tokenizer import tokens, tokens_with_spans
+from suggester.tokenizer import normalize, stopwords, tokens, tokens_with_spans
 
 
 def test_tokens_drop_stopwords_keeps_intent_terms():
@@ -26,3 +26,39 @@ def test_noise_tokens_removed_by_default():
     assert tokens("123 0000 !!!!") == []
     assert tokens("s3 bucket 0000") == ["s3", "bucket"]
 
+
+
+def test_normalize_strips_accents_on_fast_and_fallback_paths():
+    assert normalize("  Exportação  de DADOS já ") == "exportacao de dados ja"
+    # non-Latin text and stray combining marks take the NFKD filter path
+    assert normalize("Ação ΣΊ é") == "acao σι e"
+
+
+def test_stopwords_are_cached_frozensets_per_locale_tuple():
+    pt_en = stopwords(["pt", "en"])
+    assert isinstance(pt_en, frozenset)
+    assert stopwords(("pt", "en")) is pt_en
+    assert "eu" in pt_en and "the" in pt_en
+    assert "the" not in stopwords(["pt"])
+
+
+def test_tokens_with_spans_cached_results_are_not_shared():
+    first = tokens_with_spans("exportar csv")
+    first.append(("extra", (0, 0)))
+
+    assert tokens_with_spans("exportar csv") == [("exportar", (0, 8)), ("csv", (9, 12))]
+
+
+def test_tokens_with_spans_plain_and_punctuated_text_agree():
+    plain = tokens_with_spans("exportar csv e enviar email")
+    punctuated = tokens_with_spans("exportar csv, e enviar e-mail!")
+
+    assert plain == [
+        ("exportar", (0, 8)),
+        ("csv", (9, 12)),
+        ("e", (13, 14)),
+        ("enviar", (15, 21)),
+        ("email", (22, 27)),
+    ]
+    assert [tok for tok, _ in punctuated] == ["exportar", "csv", "e", "enviar", "e", "mail"]
+    assert punctuated[1] == ("csv", (9, 12))
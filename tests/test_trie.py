@@ -9,3 +9,32 @@ def test_trie_prefix_terms_basic():
     assert "csv" in t.prefix_terms("cs")
     assert "baixar" in t.prefix_terms("bai")
 
+
+
+def test_trie_delete_is_reference_counted():
+    t = Trie()
+    t.bulk_insert(["exportar", "exporta", "exportar"])
+
+    t.delete("exportar")
+    assert "exportar" in t.prefix_terms("expor")
+
+    t.delete("exportar")
+    assert "exportar" not in t
+    assert t.prefix_terms("expor") == ["exporta"]
+
+    t.delete("exporta")
+    assert t.prefix_terms("e") == []
+    assert t.prefix_terms("") == []
+
+
+def test_trie_prefix_terms_are_sorted_and_limited():
+    t = Trie()
+    t.bulk_insert(["exportar", "enviar", "exporta", "email", "csv"])
+
+    assert t.prefix_terms("e") == ["email", "enviar", "exporta", "exportar"]
+    assert t.prefix_terms("e", limit=2) == ["email", "enviar"]
+    assert t.prefix_terms("exportar") == ["exportar"]
+    assert t.prefix_terms("x") == []
+
+    t.insert("exibir")
+    assert t.prefix_terms("ex") == ["exibir", "exporta", "exportar"]